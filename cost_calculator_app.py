@@ -1,38 +1,58 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+
+st.set_page_config(
+    page_title="광모듈 생산 비용 계산기",
+    page_icon="🔬",
+    layout="wide"
+)
 
 def format_number_input(label, value, min_value=0, max_value=None, step=1, help_text=None, format_str="%d"):
-    """숫자 입력 필드에 천 단위 구분자를 표시하는 사용자 정의 함수"""
-    col1, col2 = st.sidebar.columns([3, 1])
-    with col1:
-        input_value = st.number_input(
-            label,
-            min_value=min_value,
-            max_value=max_value,
-            value=value,
-            step=step,
-            format=format_str,
-            help=help_text,
-            key=f"input_{label}"
-        )
-    with col2:
-        if input_value >= 1000:
-            st.caption(f"{input_value:,}")
-    return input_value
+    """사이드바 정수 입력 필드를 생성하는 사용자 정의 함수"""
+    return st.sidebar.number_input(
+        label,
+        min_value=min_value,
+        max_value=max_value,
+        value=value,
+        step=step,
+        format=format_str,
+        help=help_text,
+        key=f"input_{label}"
+    )
 
-def main():
-    st.set_page_config(
-        page_title="광모듈 생산 비용 계산기",
-        page_icon="🔬",
-        layout="wide"
+@st.cache_resource(show_spinner=False)
+def _build_pie(values, names) -> go.Figure:
+    """비용 구성 파이 차트 생성 (입력이 같으면 같은 Figure 객체 재사용)"""
+    return go.Figure(
+        data=[go.Pie(values=list(values), labels=list(names))],
+        layout={'title': "총 비용 구성", 'showlegend': True}
     )
 
+@st.cache_resource(show_spinner=False)
+def _build_bar(keys, values) -> go.Figure:
+    """재료비 세부 구성 바 차트 생성 (입력이 같으면 같은 Figure 객체 재사용)"""
+    return go.Figure(
+        data=[go.Bar(x=list(keys), y=list(values))],
+        layout={'title': "재료비 세부 구성", 'yaxis_title': "비용 (원)"}
+    )
+
+@st.cache_data(show_spinner=False)
+def _build_csv(items, values) -> bytes:
+    """결과 CSV 바이트 생성 (쉼표가 포함된 값은 따옴표로 감쌈, 엑셀 호환을 위해 BOM 추가)"""
+    csv_lines = ["항목,값"] + [
+        f'{item},"{value}"' if "," in value else f"{item},{value}"
+        for item, value in zip(items, values)
+    ]
+    return ("\ufeff" + "\n".join(csv_lines) + "\n").encode("utf-8")
+
+def _render_static():
+    """입력값과 무관한 제목 영역 렌더링"""
     st.title("🔬 광모듈 생산 비용 계산기")
     st.markdown("---")
 
+def main():
+    _render_static()
+
     # 사이드바 입력
     st.sidebar.header("📊 입력 파라미터")
 
@@ -136,6 +156,22 @@ def main():
         optical_module_price_won
     )
 
+    # 결과 표시
+    _render_dynamic(calculations, {
+        'production_period_months': production_period_months,
+        'target_glab_sales': target_glab_sales,
+        'monthly_glab_capacity': monthly_glab_capacity,
+        'optical_module_set_price': optical_module_set_price,
+        'optical_block_price': optical_block_price,
+        'optical_quartz_price': optical_quartz_price,
+        'other_parts_price': other_parts_price
+    })
+
+def _render_dynamic(calculations, inputs):
+    """계산 결과(지표, 매출이익 요약, 상세 분석) 렌더링"""
+    # 천 단위 구분자 문자열을 한 번만 만들어 지표/테이블/CSV에서 공유
+    fmt = {k: f"{v:,}" for k, v in calculations.items() if type(v) is int}
+
     # 메인 화면 결과 표시
     col1, col2 = st.columns(2)
 
@@ -144,37 +180,53 @@ def main():
 
         # 기본 정보 표시
         st.metric("연간 GLAB 생산 Capacity", f"{calculations['annual_glab_capacity']:,}대")
-        st.metric("필요 광모듈 수량 (총)", f"{calculations['total_optical_modules']:,}개")
-        st.metric("월간 광모듈 생산량", f"{calculations['monthly_optical_modules']:,}개/월")
-        st.metric("일간 광모듈 생산량", f"{calculations['daily_optical_modules']:,}개/일")
+        st.metric("필요 광모듈 수량 (총)", f"{fmt['total_optical_modules']}개")
+        st.metric("월간 광모듈 생산량", f"{fmt['monthly_optical_modules']}개/월")
+        st.metric("일간 광모듈 생산량", f"{fmt['daily_optical_modules']}개/일")
 
 
     with col2:
         st.subheader("💵 비용 분석")
 
         # 주요 비용 지표
-        st.metric("광블럭 제조원가", f"{calculations['optical_block_manufacturing_cost']:,}원/개")
-        st.metric("총 재료비", f"{calculations['total_material_cost']:,}원")
-        st.metric("총 인건비", f"{calculations['total_labor_cost']:,}원")
-        st.metric("총 생산 비용", f"{calculations['total_production_cost']:,}원",
+        st.metric("광블럭 제조원가", f"{fmt['optical_block_manufacturing_cost']}원/개")
+        st.metric("총 재료비", f"{fmt['total_material_cost']}원")
+        st.metric("총 인건비", f"{fmt['total_labor_cost']}원")
+        st.metric("총 생산 비용", f"{fmt['total_production_cost']}원",
                  help="재료비 + 인건비 + 감가상각비")
-        st.metric("연간 감가상각비", f"{calculations['annual_depreciation']:,}원")
+        st.metric("연간 감가상각비", f"{fmt['annual_depreciation']}원")
 
     # 매출이익 예상
     st.subheader("💰 매출이익 예상")
 
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.metric("연간 예상 매출", f"{calculations['annual_revenue']:,}원")
-        st.caption(f"{calculations['annual_revenue']/100000000:.1f}억원")
-    with col2:
-        st.metric("연간 총 생산비용", f"{calculations['annual_production_cost']:,}원")
-        st.caption(f"{calculations['annual_production_cost']/100000000:.1f}억원")
-    with col3:
-        st.metric("연간 예상 이익", f"{calculations['annual_profit']:,}원",
-                 delta=f"{calculations['profit_margin']:.1f}%")
-        st.caption(f"{calculations['annual_profit']/100000000:.1f}억원")
+    # 억원 단위 환산
+    rev_eok = calculations['annual_revenue'] / 100000000
+    cost_eok = calculations['annual_production_cost'] / 100000000
+    profit_eok = calculations['annual_profit'] / 100000000
+
+    # 지표 열을 포함한 dict로 전달해 pandas를 직접 import하지 않음
+    summary = {
+        '지표': ['연간 예상 매출', '연간 총 생산비용', '연간 예상 이익'],
+        '값(원)': [
+            fmt['annual_revenue'],
+            fmt['annual_production_cost'],
+            fmt['annual_profit']
+        ],
+        '값(억원)': [
+            f"{rev_eok:.1f}",
+            f"{cost_eok:.1f}",
+            f"{profit_eok:.1f}"
+        ]
+    }
+    st.dataframe(summary, width='stretch', hide_index=True)
+    st.caption(f"예상 이익률: {calculations['profit_margin']:.1f}%")
 
+    # 상세 비용 분석 (fragment로 분리)
+    _render_analysis(calculations, fmt, inputs)
+
+@st.fragment
+def _render_analysis(calculations, fmt, inputs):
+    """차트, 상세 결과 테이블, 다운로드 영역 렌더링 (fragment 단위로 재실행)"""
     # 상세 비용 분석
     st.subheader("📊 상세 비용 분석")
 
@@ -189,27 +241,18 @@ def main():
             '감가상각비': calculations['depreciation_cost']
         }
 
-        fig_pie = px.pie(
-            values=list(cost_breakdown.values()),
-            names=list(cost_breakdown.keys()),
-            title="총 비용 구성"
-        )
+        fig_pie = _build_pie(tuple(cost_breakdown.values()), tuple(cost_breakdown.keys()))
         st.plotly_chart(fig_pie, config={'displayModeBar': False})
 
     with col2:
         # 바 차트 - 재료비 세부 구성
         material_breakdown = {
-            '광블럭': optical_block_price * calculations['total_optical_modules'],
-            '광석영 (16개/블럭)': optical_quartz_price * 16 * calculations['total_optical_modules'],
-            '기타 부품': other_parts_price * calculations['total_optical_modules']
+            '광블럭': inputs['optical_block_price'] * calculations['total_optical_modules'],
+            '광석영 (16개/블럭)': inputs['optical_quartz_price'] * 16 * calculations['total_optical_modules'],
+            '기타 부품': inputs['other_parts_price'] * calculations['total_optical_modules']
         }
 
-        fig_bar = px.bar(
-            x=list(material_breakdown.keys()),
-            y=list(material_breakdown.values()),
-            title="재료비 세부 구성"
-        )
-        fig_bar.update_layout(yaxis_title="비용 (원)")
+        fig_bar = _build_bar(tuple(material_breakdown.keys()), tuple(material_breakdown.values()))
         st.plotly_chart(fig_bar, config={'displayModeBar': False})
 
     # 상세 계산 결과 테이블
@@ -234,30 +277,29 @@ def main():
             '연간 예상 이익'
         ],
         '값': [
-            f"{production_period_months}개월",
-            f"{target_glab_sales:,}대",
-            f"{monthly_glab_capacity:.1f}대/월",
+            f"{inputs['production_period_months']}개월",
+            f"{inputs['target_glab_sales']:,}대",
+            f"{inputs['monthly_glab_capacity']:.1f}대/월",
             f"{calculations['annual_glab_capacity']:.1f}대/년",
-            f"{calculations['total_optical_modules']:,}개",
-            f"{calculations['monthly_optical_modules']:,}개/월",
-            f"{calculations['daily_optical_modules']:,}개/일",
-            f"{calculations['optical_block_manufacturing_cost']:,}원/개",
-            f"{calculations['total_material_cost']:,}원",
-            f"{calculations['total_labor_cost']:,}원",
-            f"{optical_module_set_price:.1f}천만원",
-            f"{calculations['annual_depreciation']:,}원",
-            f"{calculations['total_production_cost']:,}원",
-            f"{calculations['annual_revenue']:,}원",
-            f"{calculations['annual_profit']:,}원"
+            f"{fmt['total_optical_modules']}개",
+            f"{fmt['monthly_optical_modules']}개/월",
+            f"{fmt['daily_optical_modules']}개/일",
+            f"{fmt['optical_block_manufacturing_cost']}원/개",
+            f"{fmt['total_material_cost']}원",
+            f"{fmt['total_labor_cost']}원",
+            f"{inputs['optical_module_set_price']:.1f}천만원",
+            f"{fmt['annual_depreciation']}원",
+            f"{fmt['total_production_cost']}원",
+            f"{fmt['annual_revenue']}원",
+            f"{fmt['annual_profit']}원"
         ]
     }
 
-    df_results = pd.DataFrame(results_data)
-    st.dataframe(df_results, width='stretch', hide_index=True)
+    st.dataframe(results_data, width='stretch', hide_index=True)
 
     # 다운로드 기능
     st.subheader("💾 결과 다운로드")
-    csv = df_results.to_csv(index=False, encoding='utf-8-sig')
+    csv = _build_csv(tuple(results_data['항목']), tuple(results_data['값']))
     st.download_button(
         label="📥 CSV로 다운로드",
         data=csv,
@@ -265,11 +307,16 @@ def main():
         mime="text/csv"
     )
 
+@st.cache_data(show_spinner=False)
 def calculate_costs(production_period_months, target_glab_sales, monthly_glab_capacity,
                    optical_block_price, optical_quartz_price, other_parts_price,
                    required_workers, annual_salary, initial_setup_cost,
                    depreciation_period_years, optical_module_price_won):
 
+    # 기간 환산 계수 (연 환산 / 기간 환산)
+    inv_m = 12.0 / production_period_months
+    m12 = production_period_months / 12.0
+
     # 기본 계산
     annual_glab_capacity = monthly_glab_capacity * 12
     modules_per_glab = 12
@@ -289,18 +336,19 @@ def calculate_costs(production_period_months, target_glab_sales, monthly_glab_ca
     optical_block_manufacturing_cost = optical_block_price + optical_quartz_cost_per_block + other_parts_price
 
     total_material_cost = optical_block_manufacturing_cost * total_optical_modules
-    total_labor_cost = annual_salary * required_workers * (production_period_months / 12)
+    total_labor_cost = annual_salary * required_workers * m12
 
     # 감가상각 계산
     annual_depreciation = initial_setup_cost / depreciation_period_years
-    depreciation_cost = annual_depreciation * (production_period_months / 12)
+    depreciation_cost = annual_depreciation * m12
 
-    total_production_cost = total_material_cost + total_labor_cost + depreciation_cost
+    variable_cost = total_material_cost + total_labor_cost
+    total_production_cost = variable_cost + depreciation_cost
 
     # 매출 및 이익 계산
-    annual_optical_modules = total_optical_modules * (12 / production_period_months)
+    annual_optical_modules = total_optical_modules * inv_m
     annual_revenue = annual_optical_modules * optical_module_price_won
-    annual_production_cost = (total_material_cost + total_labor_cost) * (12 / production_period_months) + annual_depreciation
+    annual_production_cost = variable_cost * inv_m + annual_depreciation
     annual_profit = annual_revenue - annual_production_cost
     profit_margin = (annual_profit / annual_revenue) * 100 if annual_revenue > 0 else 0
 